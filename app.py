@@ -1,14 +1,116 @@
 import streamlit as st
-import pandas as pd
+import json
+import os
 import pickle
+import types
 import numpy as np
 
+# Feature order used during training (matches the scaler's feature_names_in_)
+FEATURE_ORDER = (
+    'bedrooms', 'bathrooms', 'sqft_lot', 'floors', 'view', 'condition', 'city',
+    'sqft_living_above', 'expected_price_per_sqft', 'property_age', 'renewed_age',
+    'lot_to_living_ratio', 'has_basement'
+)
+
+# Maximum number of predictions kept per session for the investment comparison
+MAX_STORED_PREDICTIONS = 100
+
+# Select box options, built once instead of on every rerun
+BEDROOM_RANGE = tuple(range(0, 11))
+BATHROOMS_OPTIONS = (0.5, 1.0, 1.5, 2.0, 2.5, 3.0, 3.5, 4.0, 4.5, 5.0)
+FLOOR_RANGE = tuple(range(1, 5))
+VIEW_RANGE = tuple(range(5))
+CONDITION_RANGE = tuple(range(1, 6))
+
 # Load the model using pickle
-with open('best_xgb_regressor.pkl', 'rb') as file:
-    model = pickle.load(file)
+@st.cache_resource
+def load_model():
+    """Load the trained XGBoost regressor once per process, configured for single-row serving"""
+    with open('best_xgb_regressor.pkl', 'rb') as file:
+        model = pickle.load(file)
+    # Thread fan-out costs more than the tree walk for a single row, and concurrent
+    # sessions would oversubscribe the cores (also sets the booster's nthread)
+    model.set_params(n_jobs=1)
+    return model
+
+# Extract the native booster for low-overhead single-row prediction
+@st.cache_resource
+def load_booster():
+    """Return the model's native Booster"""
+    return load_model().get_booster()
+
+# Lower the booster's trees to flat node arrays for a vectorized single-row walk
+@st.cache_resource
+def load_tree_ensemble():
+    """Flatten all trees of the booster into shared node arrays"""
+    learner = json.loads(load_booster().save_raw('json'))['learner']
+    model_param = learner['learner_model_param']
+    # The walk sums raw leaf values onto base_score, which is only the prediction for a
+    # single-target gbtree regressor with an identity link
+    if learner['objective']['name'] != 'reg:squarederror':
+        raise ValueError(f"Tree ensemble requires the reg:squarederror objective, got {learner['objective']['name']}")
+    if learner['gradient_booster']['name'] != 'gbtree':
+        raise ValueError(f"Tree ensemble requires a gbtree booster, got {learner['gradient_booster']['name']}")
+    if model_param.get('num_target', '1') != '1' or model_param.get('num_class', '0') != '0':
+        raise ValueError("Tree ensemble requires a single-target model")
+    base_score = float(model_param['base_score'].strip('[]'))
+    # Node 0 is a single-leaf tree holding base_score so the sum starts from it, as in XGBoost
+    roots, feature, threshold, left, value = [0], [[0]], [[np.inf]], [[0]], [[base_score]]
+    offset, max_depth = 1, 0
+    for tree in learner['gradient_booster']['model']['trees']:
+        left_children = np.asarray(tree['left_children'])
+        right_children = np.asarray(tree['right_children'])
+        is_leaf = left_children == -1
+        # Only numerical splits are walked; categorical splits need set membership tests
+        if any(tree['split_type']) or tree['categories_nodes']:
+            raise ValueError("Tree ensemble does not support categorical splits")
+        # XGBoost allocates children in pairs, so the right child is always left + 1
+        if not (right_children[~is_leaf] == left_children[~is_leaf] + 1).all():
+            raise ValueError("Tree ensemble requires right children stored next to their left siblings")
+        node_ids = np.arange(len(left_children)) + offset
+        # Leaves point back at themselves and never step right (x >= inf is never true),
+        # so every tree can be walked for max_depth steps
+        roots.append(offset)
+        feature.append(np.where(is_leaf, 0, tree['split_indices']))
+        threshold.append(np.where(is_leaf, np.inf, tree['split_conditions']))
+        left.append(np.where(is_leaf, node_ids, left_children + offset))
+        value.append(np.where(is_leaf, tree['split_conditions'], 0.0))
+        stack = [(0, 0)]
+        while stack:
+            node, depth = stack.pop()
+            if is_leaf[node]:
+                max_depth = max(max_depth, depth)
+            else:
+                stack.append((left_children[node], depth + 1))
+                stack.append((right_children[node], depth + 1))
+        offset += len(left_children)
+    return {
+        'roots': np.asarray(roots),
+        'feature': np.concatenate(feature),
+        'threshold': np.concatenate(threshold).astype(np.float32),
+        'left': np.concatenate(left),
+        'value': np.concatenate(value).astype(np.float32),
+        'max_depth': max_depth,
+    }
+
+# Walk every tree of the ensemble at once for a single input row
+def predict_tree_ensemble(ensemble, row):
+    """Return the booster's prediction for a single row as a 1-element float32 array"""
+    # XGBoost compares float32 feature values against float32 split conditions
+    x = np.asarray(row, dtype=np.float32).ravel()
+    # Missing values would need each node's default_left routing, which the walk does not model
+    if np.isnan(x).any():
+        raise ValueError("Tree ensemble requires an input row without missing values")
+    feature, threshold, left = ensemble['feature'], ensemble['threshold'], ensemble['left']
+    node = ensemble['roots']
+    for _ in range(ensemble['max_depth']):
+        # Step to the right sibling when the split test fails (XGBoost goes left on x < threshold)
+        node = left[node] + (x[feature[node]] >= threshold[node])
+    # Accumulate leaf values sequentially in float32 to match XGBoost bit for bit
+    return np.cumsum(ensemble['value'][node], dtype=np.float32)[-1:]
 
 # Load the normalization scaler
-@st.cache_data
+@st.cache_resource
 def load_scaler():
     """Load the MinMaxScaler used during training"""
     try:
@@ -22,153 +124,62 @@ def load_scaler():
         st.error(f"Error loading scaler.pkl: {str(e)}")
         return None
 
+# Extract the scaler's affine parameters for the fused normalization
+@st.cache_resource
+def load_scaler_params(_scaler):
+    """Return the MinMaxScaler's scale_ and min_ vectors"""
+    if _scaler is None:
+        return None
+    return _scaler.scale_, _scaler.min_
+
+# Normalize and predict a single input row in one pass
+def predict_one(ensemble, raw_row, scaler_params):
+    """Apply the MinMaxScaler transform (x * scale_ + min_) to raw_row in place and predict"""
+    scale, min_ = scaler_params
+    raw_row *= scale
+    raw_row += min_
+    return predict_tree_ensemble(ensemble, raw_row)
+
+# Normalize and predict a batch of input rows with a single booster call
+def predict_batch(booster, raw_rows, scaler_params):
+    """Apply the MinMaxScaler transform to raw_rows in place and predict every row at once"""
+    scale, min_ = scaler_params
+    raw_rows *= scale
+    raw_rows += min_
+    return booster.inplace_predict(raw_rows)
+
+# Load the custom CSS once and reuse the rendered <style> block across reruns
+@st.cache_data
+def load_css():
+    """Load the dark mode stylesheet from style.css"""
+    with open('style.css') as file:
+        return f"<style>\n{file.read()}</style>"
+
+# Reset the stored predictions to an empty ring buffer of prices and their feature rows
+def reset_predictions():
+    """Allocate the fixed-size prediction buffers in session state"""
+    st.session_state.prices = np.empty(MAX_STORED_PREDICTIONS, dtype=np.float32)
+    st.session_state.feature_rows = [None] * MAX_STORED_PREDICTIONS
+    st.session_state.prediction_count = 0
+
 # Initialize session state for storing predictions
-if 'predictions' not in st.session_state:
-    st.session_state.predictions = []
+if 'prices' not in st.session_state:
+    reset_predictions()
+
+# Initialize the queue of configurations waiting for a batch prediction
+if 'pending_configs' not in st.session_state:
+    st.session_state.pending_configs = []
+
+# Preallocate the single model input row once per session (float64, as the scaler was fitted;
+# a float32 row is normalized with float32 rounding and shifts predictions across splits)
+if 'input_row' not in st.session_state:
+    st.session_state.input_row = np.empty((1, len(FEATURE_ORDER)), dtype=np.float64)
 
 # Streamlit app title and configuration
 st.set_page_config(page_title='Real Estate Price Prediction System', layout='wide')
 
 # Custom CSS for dark mode and styling
-st.markdown("""
-<style>
-    /* Main app background */
-    .stApp {
-        background-color: #1e1e1e;
-        color: white;
-    }
-    
-    /* Title container styling */
-    .title-container {
-        background-color: #90EE90;
-        color: #1e1e1e;
-        padding: 20px;
-        border-radius: 10px;
-        text-align: center;
-        margin-bottom: 30px;
-        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-    }
-    
-    /* Predict button container */
-    .predict-container {
-        background-color: #90EE90;
-        color: #1e1e1e;
-        padding: 20px;
-        border-radius: 10px;
-        text-align: center;
-        margin-top: 30px;
-        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-    }
-    
-    /* Column headers */
-    .column-header {
-        color: #90EE90;
-        font-size: 20px;
-        font-weight: bold;
-        margin-bottom: 15px;
-        text-align: center;
-    }
-    
-    /* Input containers */
-    .input-section {
-        background-color: transparent;
-        padding: 0px;
-        border-radius: 0px;
-        margin-bottom: 15px;
-        border: none;
-    }
-    
-    /* Override Streamlit's default styling */
-    .stSelectbox label, .stSlider label {
-        color: white !important;
-        font-weight: 500;
-    }
-    
-    /* Button styling */
-    .stButton > button {
-        background-color: #2d2d2d;
-        color: white;
-        border: 2px solid #90EE90;
-        border-radius: 5px;
-        padding: 10px 20px;
-        font-size: 16px;
-        font-weight: bold;
-        width: 100%;
-    }
-    
-    .stButton > button:hover {
-        background-color: #90EE90;
-        color: #1e1e1e;
-    }
-    
-    /* Sidebar styling */
-    .sidebar .sidebar-content {
-        background-color: #2d2d2d;
-        color: white;
-    }
-    
-    /* Sidebar headers */
-    .sidebar-header {
-        color: #90EE90;
-        font-size: 18px;
-        font-weight: bold;
-        margin-bottom: 15px;
-        text-align: center;
-        padding: 10px;
-        background-color: #1e1e1e;
-        border-radius: 5px;
-    }
-    
-    /* Investment option containers */
-    .investment-container {
-        background-color: #1a1a1a;
-        color: white;
-        padding: 15px;
-        border-radius: 8px;
-        margin-bottom: 15px;
-        border-left: 4px solid #90EE90;
-        border: 1px solid #404040;
-    }
-    
-    /* Property feature list styling */
-    .feature-list {
-        background-color: #1a1a1a;
-        color: white;
-        padding: 10px;
-        border-radius: 5px;
-        margin-top: 10px;
-        font-family: monospace;
-        font-size: 14px;
-        line-height: 1.6;
-        border: 1px solid #404040;
-        white-space: pre-line;
-    }
-    
-    /* Clear predictions button */
-    .clear-button {
-        background-color: #ff6b6b !important;
-        color: white !important;
-        border: none !important;
-        border-radius: 5px !important;
-        padding: 8px 16px !important;
-        width: 100% !important;
-        margin-top: 10px !important;
-    }
-    
-    /* Prediction result styling */
-    .prediction-result {
-        background-color: #90EE90;
-        color: #1e1e1e;
-        padding: 20px;
-        border-radius: 10px;
-        text-align: center;
-        font-size: 24px;
-        font-weight: bold;
-        margin-top: 20px;
-        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-    }
-</style>
-""", unsafe_allow_html=True)
+st.markdown(load_css(), unsafe_allow_html=True)
 
 # Title with custom styling
 st.markdown("""
@@ -178,42 +189,145 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-# Load city-condition medians from pickle file
-@st.cache_data
+# Read city-condition medians, persisted to Streamlit's disk cache across restarts
+@st.cache_data(persist="disk", show_spinner=False)
+def read_city_condition_medians(path, mtime):
+    """Read city-condition medians as a {(city, condition): expected_price_per_sqft} dict
+
+    mtime is only part of the cache key, so the persisted copy is refreshed when the file changes.
+    """
+    # pandas is only needed to decode the medians file, so keep it off the app's import path
+    import pandas as pd
+
+    loaded_df = pd.read_parquet(path, engine='pyarrow', columns=['city', 'condition', 'expected_price_per_sqft'])
+    keys = zip(loaded_df['city'].tolist(), loaded_df['condition'].tolist())
+    return dict(zip(keys, loaded_df['expected_price_per_sqft'].tolist()))
+
+# Load city-condition medians from parquet file
 def load_city_condition_medians():
-    """Load city-condition medians from pickle file"""
+    """Load city-condition medians, reporting load errors in the app"""
     try:
-        loaded_df = pd.read_pickle('city_condition_medians.pkl')
-        return loaded_df
+        path = 'city_condition_medians.parquet'
+        return read_city_condition_medians(path, os.path.getmtime(path))
     except FileNotFoundError:
-        st.error("city_condition_medians.pkl file not found. Please ensure the file is in the same directory as this script.")
+        st.error("city_condition_medians.parquet file not found. Please ensure the file is in the same directory as this script.")
         return None
     except Exception as e:
-        st.error(f"Error loading city_condition_medians.pkl: {str(e)}")
+        st.error(f"Error loading city_condition_medians.parquet: {str(e)}")
         return None
 
 # Function to calculate expected price per sqft
-def calculate_expected_price_per_sqft_single(city, condition, medians_df):
+def calculate_expected_price_per_sqft_single(city, condition, medians):
   
-    if medians_df is None:
+    if medians is None:
         return 200  # Default value if data couldn't be loaded
     
-    # Filter for the specific city and condition combination
-    result = medians_df[(medians_df['city'] == city) & (medians_df['condition'] == condition)]
+    # Look up the specific city and condition combination, with a default fallback
+    return medians.get((city, condition), 200)
+
+# Function to engineer the model features into a single input row
+def build_input_row(out, bedrooms, bathrooms, sqft_lot, floors, view, condition, city_number,
+                    sqft_living_above, expected_price_per_sqft, yr_built, yr_renovated, has_basement):
+    """Fill out in FEATURE_ORDER and return (property_age, renewed_age, lot_to_living_ratio)"""
+    # Calculate property and renewed age
+    current_year = 2014
+    property_age = current_year - yr_built
+    effective_yr_renovated = yr_built if yr_renovated == 0 else yr_renovated
+    renewed_age = current_year - effective_yr_renovated
     
-    if not result.empty:
-        return result['expected_price_per_sqft'].iloc[0]
+    # Calculate lot to living ratio
+    if sqft_living_above > 0:
+        lot_to_living_ratio = sqft_lot / sqft_living_above
     else:
-        return 200  # Default fallback
+        lot_to_living_ratio = 0
+    
+    # Store all features with a single write into the row
+    out[:] = (
+        bedrooms, bathrooms, sqft_lot, floors, view, condition, city_number,
+        sqft_living_above, expected_price_per_sqft, property_age, renewed_age,
+        lot_to_living_ratio, has_basement
+    )
+    return property_age, renewed_age, lot_to_living_ratio
+
+# Function to engineer one property configuration into an input row and its stored features
+def prepare_features(out, config, medians):
+    """Fill out from the raw widget values in config and return the features saved for comparison"""
+    # Extract city number from mapping
+    city_number = city_mapping[config['city']]
+    
+    # Calculate expected price per sqft
+    expected_price_per_sqft = calculate_expected_price_per_sqft_single(city_number, config['condition'], medians)
+    
+    property_age, renewed_age, lot_to_living_ratio = build_input_row(
+        out, config['bedrooms'], config['bathrooms'], config['sqft_lot'], config['floors'], config['view'],
+        config['condition'], city_number, config['sqft_living_above'], expected_price_per_sqft,
+        config['yr_built'], config['yr_renovated'], config['has_basement']
+    )
+    return {
+        'bedrooms': config['bedrooms'],
+        'bathrooms': config['bathrooms'],
+        'floors': config['floors'],
+        'sqft_lot': config['sqft_lot'],
+        'sqft_living_above': config['sqft_living_above'],
+        'yr_built': config['yr_built'],
+        'yr_renovated': config['yr_renovated'],
+        'has_basement': 'Yes' if config['has_basement'] else 'No',
+        'view': config['view'],
+        'condition': config['condition'],
+        'city': config['city'],
+        'property_age': property_age,
+        'renewed_age': renewed_age,
+        'lot_to_living_ratio': lot_to_living_ratio,
+        'expected_price_per_sqft': expected_price_per_sqft
+    }
+
+# Function to record a prediction, overwriting the oldest slot once the ring buffer is full
+def store_prediction(price, features):
+    """Save a predicted price and its features for the investment comparison"""
+    slot = st.session_state.prediction_count % MAX_STORED_PREDICTIONS
+    st.session_state.prices[slot] = price
+    st.session_state.feature_rows[slot] = features
+    st.session_state.prediction_count += 1
+
+# Batch queue button callbacks run before the rerun, so the queue panel is drawn from the updated queue
+def take_pending_configs():
+    """Move the queued configurations out of the queue for a batch prediction"""
+    st.session_state.batch_configs = st.session_state.pending_configs
+    st.session_state.pending_configs = []
+
+def clear_pending_configs():
+    """Discard all queued configurations"""
+    st.session_state.pending_configs = []
+
+# Function to render a stored property's features for the sidebar
+def render_features_text(features):
+    """Format a stored property's features as the sidebar feature list"""
+    return f"""bedrooms: {features['bedrooms']}
+bathrooms: {features['bathrooms']}
+floors: {features['floors']}
+sqft_lot: {features['sqft_lot']:,}
+sqft_living_above: {features['sqft_living_above']:,}
+yr_built: {features['yr_built']}
+yr_renovated: {features['yr_renovated']}
+has_basement: {features['has_basement']}
+view: {features['view']}
+condition: {features['condition']}
+city: {features['city']}
+property_age: {features['property_age']} years
+renewed_age: {features['renewed_age']} years
+lot_to_living_ratio: {features['lot_to_living_ratio']:.2f}
+expected_price_per_sqft: ${features['expected_price_per_sqft']:.2f}"""
 
 # Sidebar for investment comparison
 with st.sidebar:
     st.markdown('<div class="sidebar-header">📊 Compare Investment Opportunities</div>', unsafe_allow_html=True)
     
-    if len(st.session_state.predictions) == 0:
+    if st.session_state.prediction_count == 0:
         st.info("Make some predictions first to compare investment opportunities!")
     else:
-        st.write(f"**Total Predictions Made:** {len(st.session_state.predictions)}")
+        st.write(f"**Total Predictions Made:** {st.session_state.prediction_count}")
+        if st.session_state.prediction_count > MAX_STORED_PREDICTIONS:
+            st.caption(f"Comparing the most recent {MAX_STORED_PREDICTIONS} predictions")
         
         # Investment preference selection
         st.markdown("### Select Investment Strategy")
@@ -230,184 +344,221 @@ with st.sidebar:
         
         if investment_choice != "Select an option":
             # Find lowest and highest priced properties
-            prices = [pred['price'] for pred in st.session_state.predictions]
+            stored_count = min(st.session_state.prediction_count, MAX_STORED_PREDICTIONS)
+            prices = st.session_state.prices[:stored_count]
             
             if investment_choice == "Minimal Capital Investment":
-                min_price_idx = prices.index(min(prices))
-                selected_property = st.session_state.predictions[min_price_idx]
+                selected_idx = int(np.argmin(prices))
                 investment_type = "💰 Minimal Capital Investment"
                 investment_description = "Lowest priced property from your predictions"
             else:  # High Capital Investment
-                max_price_idx = prices.index(max(prices))
-                selected_property = st.session_state.predictions[max_price_idx]
+                selected_idx = int(np.argmax(prices))
                 investment_type = "🏆 High Capital Investment"
                 investment_description = "Highest priced property from your predictions"
             
+            selected_price = prices[selected_idx]
+            selected_features = st.session_state.feature_rows[selected_idx]
+            
             # Display selected investment option
             st.markdown(f"""
             <div class="investment-container">
                 <h4>{investment_type}</h4>
                 <p style="color: #cccccc; margin-bottom: 10px;">{investment_description}</p>
-                <h3 style="color: #90EE90;">${selected_property['price']:,.2f}</h3>
+                <h3 style="color: #90EE90;">${selected_price:,.2f}</h3>
             </div>
             """, unsafe_allow_html=True)
             
             # Display property features
             st.markdown("**Property Features:**")
-            features_text = f"""bedrooms: {selected_property['features']['bedrooms']}
-bathrooms: {selected_property['features']['bathrooms']}
-floors: {selected_property['features']['floors']}
-sqft_lot: {selected_property['features']['sqft_lot']:,}
-sqft_living_above: {selected_property['features']['sqft_living_above']:,}
-yr_built: {selected_property['features']['yr_built']}
-yr_renovated: {selected_property['features']['yr_renovated']}
-has_basement: {selected_property['features']['has_basement']}
-view: {selected_property['features']['view']}
-condition: {selected_property['features']['condition']}
-city: {selected_property['features']['city']}
-property_age: {selected_property['features']['property_age']} years
-renewed_age: {selected_property['features']['renewed_age']} years
-lot_to_living_ratio: {selected_property['features']['lot_to_living_ratio']:.2f}
-expected_price_per_sqft: ${selected_property['features']['expected_price_per_sqft']:.2f}"""
+            features_text = render_features_text(selected_features)
             
             st.markdown(f'<div class="feature-list">{features_text}</div>', unsafe_allow_html=True)
         
         # Clear predictions button
         st.markdown("---")
         if st.button("🗑️ Clear All Predictions", key="clear_predictions"):
-            st.session_state.predictions = []
+            reset_predictions()
             st.rerun()
 
-# Load city-condition medians and scaler at the start of the app
-city_condition_medians_df = load_city_condition_medians()
-scaler = load_scaler()
-
-# Display warning if scaler couldn't be loaded
-if scaler is None:
-    st.warning("⚠️ Normalization scaler could not be loaded. Predictions may be inaccurate.")
+# Load city-condition medians at the start of the app
+city_condition_medians = load_city_condition_medians()
 
 # City mapping
-city_mapping = {
-    "Shoreline": 1, "Kent": 2, "Bellevue": 3, "Redmond": 4, "Seattle": 5,
-    "Maple Valley": 6, "North Bend": 7, "Lake Forest Park": 8, "Sammamish": 9,
-    "Auburn": 10, "Des Moines": 11, "Bothell": 12, "Federal Way": 13,
-    "Kirkland": 14, "Issaquah": 15, "Woodinville": 16, "Normandy Park": 17,
-    "Fall City": 18, "Renton": 19, "Carnation": 20, "Snoqualmie": 21,
-    "Duvall": 22, "Burien": 23, "Covington": 24, "Inglewood-Finn Hill": 25,
-    "Kenmore": 26, "Newcastle": 27, "Black Diamond": 28, "Ravensdale": 29,
-    "Clyde Hill": 30, "Algona": 31, "Mercer Island": 32, "Skykomish": 33,
-    "Tukwila": 34, "Vashon": 35, "SeaTac": 36, "Enumclaw": 37,
-    "Snoqualmie Pass": 38, "Pacific": 39, "Beaux Arts Village": 40,
-    "Preston": 41, "Milton": 42, "Yarrow Point": 43, "Medina": 44
+@st.cache_resource
+def load_city_mapping():
+    """Return the read-only city to city number mapping and the city names for the selectbox"""
+    city_mapping = {
+        "Shoreline": 1, "Kent": 2, "Bellevue": 3, "Redmond": 4, "Seattle": 5,
+        "Maple Valley": 6, "North Bend": 7, "Lake Forest Park": 8, "Sammamish": 9,
+        "Auburn": 10, "Des Moines": 11, "Bothell": 12, "Federal Way": 13,
+        "Kirkland": 14, "Issaquah": 15, "Woodinville": 16, "Normandy Park": 17,
+        "Fall City": 18, "Renton": 19, "Carnation": 20, "Snoqualmie": 21,
+        "Duvall": 22, "Burien": 23, "Covington": 24, "Inglewood-Finn Hill": 25,
+        "Kenmore": 26, "Newcastle": 27, "Black Diamond": 28, "Ravensdale": 29,
+        "Clyde Hill": 30, "Algona": 31, "Mercer Island": 32, "Skykomish": 33,
+        "Tukwila": 34, "Vashon": 35, "SeaTac": 36, "Enumclaw": 37,
+        "Snoqualmie Pass": 38, "Pacific": 39, "Beaux Arts Village": 40,
+        "Preston": 41, "Milton": 42, "Yarrow Point": 43, "Medina": 44
+    }
+    return types.MappingProxyType(city_mapping), tuple(city_mapping)
+
+city_mapping, city_names = load_city_mapping()
+
+# Batch mode queues several configurations and predicts them together in one call
+batch_mode = st.checkbox("Batch mode: queue several configurations and predict them together", key="batch_mode")
+
+# Collect inputs in a form so widget changes only rerun the app on submit
+with st.form("predict_form"):
+    # Create two columns for the layout
+    col1, col2 = st.columns(2)
+
+    # Left column - Sliders
+    with col1:
+        st.markdown('<div class="column-header"> Property Measurements & Details</div>', unsafe_allow_html=True)
+        
+        sqft_lot = st.slider('Square Feet of Lot', 0, 100000, 10000)
+        sqft_living_above = st.slider('Square Feet of Living Above Ground', 0, 10000, 2000)
+        yr_built = st.slider('Year Built', 1900, 2014, 2000)
+        yr_renovated = st.slider('Year Renovated (0 if never renovated)', 0, 2014, 0)
+        city = st.selectbox('Select City', city_names)
+        has_basement = st.slider('Has Basement (0=No, 1=Yes)', 0, 1, 0)
+
+    # Right column - Select boxes
+    with col2:
+        st.markdown('<div class="column-header"> Property Features</div>', unsafe_allow_html=True)
+        
+        bedrooms = st.selectbox('Number of Bedrooms', BEDROOM_RANGE, index=3)
+        bathrooms = st.selectbox('Number of Bathrooms', BATHROOMS_OPTIONS, index=3, format_func=lambda x: f"{x:g}")
+        floors = st.selectbox('Number of Floors', FLOOR_RANGE, index=0)
+        view = st.selectbox('View Rating (0-4)', VIEW_RANGE, index=0)
+        condition = st.selectbox('Property Condition (1-5)', CONDITION_RANGE, index=2)
+
+    # Predict button with custom styling (submits the form)
+    st.markdown('<div class="predict-container">', unsafe_allow_html=True)
+    predict_clicked = st.form_submit_button('Add Configuration to Batch' if batch_mode else 'Predict Property Price')
+    st.markdown('</div>', unsafe_allow_html=True)
+
+# Raw widget values of the submitted configuration
+config = {
+    'bedrooms': bedrooms,
+    'bathrooms': bathrooms,
+    'sqft_lot': sqft_lot,
+    'floors': floors,
+    'view': view,
+    'condition': condition,
+    'city': city,
+    'sqft_living_above': sqft_living_above,
+    'yr_built': yr_built,
+    'yr_renovated': yr_renovated,
+    'has_basement': has_basement,
 }
 
-# Create two columns for the layout
-col1, col2 = st.columns(2)
+# Batch queue management
+if batch_mode and predict_clicked:
+    if len(st.session_state.pending_configs) < MAX_STORED_PREDICTIONS:
+        st.session_state.pending_configs.append(config)
+    else:
+        st.warning(f"The batch is full ({MAX_STORED_PREDICTIONS} configurations). Predict or clear it first.")
 
-# Left column - Sliders
-with col1:
-    st.markdown('<div class="column-header"> Property Measurements & Details</div>', unsafe_allow_html=True)
-    
-    sqft_lot = st.slider('Square Feet of Lot', 0, 100000, 10000)
-    sqft_living_above = st.slider('Square Feet of Living Above Ground', 0, 10000, 2000)
-    yr_built = st.slider('Year Built', 1900, 2014, 2000)
-    yr_renovated = st.slider('Year Renovated (0 if never renovated)', 0, 2014, 0)
-    city = st.selectbox('Select City', list(city_mapping.keys()))
-    has_basement = st.slider('Has Basement (0=No, 1=Yes)', 0, 1, 0)
-
-# Right column - Select boxes
-with col2:
-    st.markdown('<div class="column-header"> Property Features</div>', unsafe_allow_html=True)
+# Reserve the queue panel above the batch results; it is filled once the batch has been handled
+queue_panel = st.container()
+
+# Batch prediction logic and display (configurations handed over by take_pending_configs)
+batch_configs = st.session_state.pop('batch_configs', None)
+if batch_configs:
+    # Load the model and scaler on first use; later clicks hit the resource cache
+    booster = load_booster()
+    scaler = load_scaler()
+    scaler_params = load_scaler_params(scaler)
+
+    # Engineer every queued configuration into one (N, 13) input matrix
+    input_rows = np.empty((len(batch_configs), len(FEATURE_ORDER)), dtype=np.float64)
+    batch_features = [
+        prepare_features(input_rows[i], batch_config, city_condition_medians)
+        for i, batch_config in enumerate(batch_configs)
+    ]
     
-    bedrooms = st.selectbox('Number of Bedrooms', list(range(0, 11)), index=3)
-    bathrooms_options = ["0.5", "1", "1.5", "2", "2.5", "3", "3.5", "4", "4.5", "5"]
-    bathrooms = st.selectbox('Number of Bathrooms', bathrooms_options, index=3)
-    floors = st.selectbox('Number of Floors', list(range(1, 5)), index=0)
-    view = st.selectbox('View Rating (0-4)', list(range(5)), index=0)
-    condition = st.selectbox('Property Condition (1-5)', list(range(1, 6)), index=2)
-
-# Predict button with custom styling
-st.markdown('<div class="predict-container">', unsafe_allow_html=True)
-predict_clicked = st.button('Predict Property Price')
-st.markdown('</div>', unsafe_allow_html=True)
+    try:
+        if scaler is not None:
+            predictions = predict_batch(booster, input_rows, scaler_params)
+        else:
+            st.warning("Making predictions without normalization - results may be inaccurate!")
+            predictions = booster.inplace_predict(input_rows)
+        
+        # Store every prediction in session state
+        first_prediction_number = st.session_state.prediction_count + 1
+        for predicted_price, features in zip(predictions, batch_features):
+            store_prediction(predicted_price, features)
+        
+        # Display the batch summary with custom styling
+        st.markdown(f"""
+        <div class="prediction-result">
+            <h2> Batch Prediction Complete</h2>
+            <h1>{len(batch_features)} Properties Priced</h1>
+            <small>Predictions #{first_prediction_number}-#{st.session_state.prediction_count} saved for comparison</small>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        st.table([
+            {
+                'City': features['city'],
+                'Bedrooms': features['bedrooms'],
+                'Bathrooms': features['bathrooms'],
+                'Sqft Lot': f"{features['sqft_lot']:,}",
+                'Sqft Living Above': f"{features['sqft_living_above']:,}",
+                'Year Built': features['yr_built'],
+                'Predicted Price': f"${predicted_price:,.2f}",
+            }
+            for predicted_price, features in zip(predictions, batch_features)
+        ])
+            
+    except Exception as e:
+        # Put the configurations back in the queue so the batch can be retried
+        st.session_state.pending_configs = batch_configs + st.session_state.pending_configs
+        st.error(f"Error making predictions: {str(e)}")
+        st.error("Please check that your model expects the same features as provided.")
+
+# Batch queue display, drawn from the queue as updated by this run
+if batch_mode:
+    pending_configs = st.session_state.pending_configs
+    with queue_panel:
+        st.write(f"**Queued Configurations:** {len(pending_configs)}")
+        queue_col1, queue_col2 = st.columns(2)
+        with queue_col1:
+            st.button("Predict All Queued Configurations", disabled=not pending_configs, on_click=take_pending_configs)
+        with queue_col2:
+            st.button("Clear Queue", disabled=not pending_configs, on_click=clear_pending_configs)
 
 # Prediction logic and display
-if predict_clicked:
-    # Convert bathrooms from string to float
-    bathrooms_float = float(bathrooms)
-    
-    # Extract city number from mapping
-    city_number = city_mapping[city]
+if predict_clicked and not batch_mode:
+    # Load the model and scaler on first use; later clicks hit the resource cache
+    ensemble = load_tree_ensemble()
+    scaler = load_scaler()
+    scaler_params = load_scaler_params(scaler)
 
-    # Calculate property and renewed age
-    current_year = 2014  
-    property_age = current_year - yr_built
-    effective_yr_renovated = yr_built if yr_renovated == 0 else yr_renovated
-    renewed_age = current_year - effective_yr_renovated
-    
-    # Calculate lot to living ratio
-    if sqft_living_above > 0:
-        lot_to_living_ratio = sqft_lot / sqft_living_above
-    else:
-        lot_to_living_ratio = 0
-    
-    # Calculate expected price per sqft
-    expected_price_per_sqft = calculate_expected_price_per_sqft_single(city_number, condition, city_condition_medians_df)
-    
-    # DataFrame with preprocessed features
-    input_data = pd.DataFrame({
-        'bedrooms': [bedrooms],
-        'bathrooms': [bathrooms_float],
-        'sqft_lot': [sqft_lot],
-        'floors': [floors],
-        'view': [view],
-        'condition': [condition],
-        'city': [city_number],
-        'sqft_living_above': [sqft_living_above],
-        'expected_price_per_sqft': [expected_price_per_sqft],
-        'property_age': [property_age],
-        'renewed_age': [renewed_age],
-        'lot_to_living_ratio': [lot_to_living_ratio], 
-        'has_basement': [has_basement],    
-    })
+    # Display warning if scaler couldn't be loaded
+    if scaler is None:
+        st.warning("⚠️ Normalization scaler could not be loaded. Predictions may be inaccurate.")
+
+    # Engineer the features into the preallocated input row
+    input_data = st.session_state.input_row
+    features = prepare_features(input_data[0], config, city_condition_medians)
     
     # Make prediction
     try:
         # Apply normalization using the loaded scaler
         if scaler is not None:
             # Normalize the input data using the same scaler from training
-            input_data_normalized = scaler.transform(input_data)
-            prediction = model.predict(input_data_normalized)
+            prediction = predict_one(ensemble, input_data, scaler_params)
         else:
             # If scaler couldn't be loaded, make prediction without normalization
             st.warning("Making prediction without normalization - results may be inaccurate!")
-            prediction = model.predict(input_data)
+            prediction = predict_tree_ensemble(ensemble, input_data)
         
         predicted_price = prediction[0]
         
         # Store prediction in session state
-        prediction_data = {
-            'price': predicted_price,
-            'features': {
-                'bedrooms': bedrooms,
-                'bathrooms': bathrooms_float,
-                'floors': floors,
-                'sqft_lot': sqft_lot,
-                'sqft_living_above': sqft_living_above,
-                'yr_built': yr_built,
-                'yr_renovated': yr_renovated,
-                'has_basement': 'Yes' if has_basement else 'No',
-                'view': view,
-                'condition': condition,
-                'city': city,
-                'property_age': property_age,
-                'renewed_age': renewed_age,
-                'lot_to_living_ratio': lot_to_living_ratio,
-                'expected_price_per_sqft': expected_price_per_sqft
-            }
-        }
-        
-        st.session_state.predictions.append(prediction_data)
+        store_prediction(predicted_price, features)
         
         predicted_price_formatted = f"${predicted_price:,.2f}"
         
@@ -417,16 +568,16 @@ if predict_clicked:
             <h2> Predicted Property Price</h2>
             <h1>{predicted_price_formatted}</h1>
             <p>Based on the selected property features and location</p>
-            <small>Prediction #{len(st.session_state.predictions)} saved for comparison</small>
+            <small>Prediction #{st.session_state.prediction_count} saved for comparison</small>
         </div>
         """, unsafe_allow_html=True)
         
         # Display calculated features for debugging/transparency
         with st.expander("Calculated Features"):
-            st.write(f"**Property Age:** {property_age} years")
-            st.write(f"**Renewed Age:** {renewed_age} years")
-            st.write(f"**Lot to Living Ratio:** {lot_to_living_ratio:.2f}")
-            st.write(f"**Expected Price per Sqft:** ${expected_price_per_sqft:.2f}")
+            st.write(f"**Property Age:** {features['property_age']} years")
+            st.write(f"**Renewed Age:** {features['renewed_age']} years")
+            st.write(f"**Lot to Living Ratio:** {features['lot_to_living_ratio']:.2f}")
+            st.write(f"**Expected Price per Sqft:** ${features['expected_price_per_sqft']:.2f}")
             st.write(f"**Normalization Applied:** {'Yes' if scaler is not None else 'No'}")
             
     except Exception as e: